@@ -1,26 +1,253 @@
 import numpy as np
 import cv2
 import os
+import queue
+import threading
 import matplotlib.pyplot as plt
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 
-print("Current Date and Time (UTC - YYYY-MM-DD HH:MM:SS formatted): 2025-11-03 09:59:25")
-print("Current User's Login: JukoYao")
-print("-" * 50)
+from numba import njit
+
+# read_scale -> cv2.imread 标志. OpenCV 对 PNG 仍按全分辨率解码后再缩小, 所以缩小读取
+# 只减少后续特征计算量, 不减少解码时间; 宽度小于 read_scale 像素的细线会在阈值化后消失
+_IMREAD_FLAGS = {
+    1: cv2.IMREAD_GRAYSCALE,
+    2: cv2.IMREAD_REDUCED_GRAYSCALE_2,
+    4: cv2.IMREAD_REDUCED_GRAYSCALE_4,
+    8: cv2.IMREAD_REDUCED_GRAYSCALE_8,
+}
+
+# process_dataset 时保留前几张二值图, visualize_features 不必重新读图
+PREVIEW_SAMPLES = 10
+
+# 每个 worker 任务处理的图片数, 摊薄进程间通信开销
+BATCH_SIZE = 32
+
+
+def _list_png_files(directory):
+    """Sorted names of the .png files in directory"""
+    with os.scandir(directory) as it:
+        return sorted(e.name for e in it if e.name.endswith('.png') and e.is_file())
+
+
+def _load_binary(image_path, read_scale=1):
+    """Read an image once and return its inverted binary mask (0/255)"""
+    image = cv2.imread(image_path, _IMREAD_FLAGS[read_scale])
+    if image is None:
+        raise ValueError(f"Cannot read image: {image_path}")
+
+    _, binary = cv2.threshold(image, 127, 255, cv2.THRESH_BINARY_INV)
+    return binary
+
+
+def _hu_from_raw_moments(m):
+    """
+    由 10 个原点矩 (OpenCV 顺序 m00, m10, m01, m20, m11, m02, m30, m21, m12, m03)
+    计算 7 个 Hu 不变矩, 与 cv2.HuMoments(cv2.moments(...)) 一致
+    """
+    m00, m10, m01, m20, m11, m02, m30, m21, m12, m03 = m
+
+    inv_m00 = 1.0 / m00 if abs(m00) > np.finfo(np.float64).eps else 0.0
+    cx = m10 * inv_m00
+    cy = m01 * inv_m00
+
+    # 中心矩
+    mu20 = m20 - m10 * cx
+    mu11 = m11 - m10 * cy
+    mu02 = m02 - m01 * cy
+    mu30 = m30 - cx * (3 * mu20 + cx * m10)
+    mu21 = m21 - cx * (mu11 * 2 + cx * m01) - cy * mu20
+    mu12 = m12 - cy * (mu11 * 2 + cy * m10) - cx * mu02
+    mu03 = m03 - cy * (3 * mu02 + cy * m01)
+
+    # 归一化中心矩
+    inv_sqrt_m00 = np.sqrt(abs(inv_m00))
+    s2 = inv_m00 * inv_m00
+    s3 = s2 * inv_sqrt_m00
+    nu20, nu11, nu02 = mu20 * s2, mu11 * s2, mu02 * s2
+    nu30, nu21, nu12, nu03 = mu30 * s3, mu21 * s3, mu12 * s3, mu03 * s3
+
+    t0 = nu30 + nu12
+    t1 = nu21 + nu03
+    q0 = t0 * t0
+    q1 = t1 * t1
+    n4 = 4 * nu11
+    s = nu20 + nu02
+    d = nu20 - nu02
+
+    hu = np.empty(7)
+    hu[0] = s
+    hu[1] = d * d + n4 * nu11
+    hu[3] = q0 + q1
+    hu[5] = d * (q0 - q1) + n4 * t0 * t1
+    t0 = t0 * (q0 - 3 * q1)
+    t1 = t1 * (3 * q0 - q1)
+    q0 = nu30 - 3 * nu12
+    q1 = 3 * nu21 - nu03
+    hu[2] = q0 * q0 + q1 * q1
+    hu[4] = q0 * t0 + q1 * t1
+    hu[6] = q1 * t0 - q0 * t1
+
+    return hu
+
+
+def _centroid_from_moments(m, h, w):
+    """由原点矩求归一化到 [0, 1] 的重心, 空图取图像中心"""
+    if m[0] == 0:
+        return 0.5, 0.5
+
+    # ⭐ 归一化到 [0, 1]
+    centroid_x_norm = m[1] / m[0] / w
+    centroid_y_norm = m[2] / m[0] / h
+
+    return centroid_x_norm, centroid_y_norm
+
+
+@njit(cache=True)
+def _kernel(binary, gs):
+    """
+    单次遍历二值图, 同时累加 10 个原点矩 (像素计数) 和 gs x gs 网格计数
+    """
+    h, w = binary.shape
+    grid_h = h // gs
+    grid_w = w // gs
+
+    m = np.zeros(10)
+    counts = np.zeros((gs, gs))
+    for y in range(h):
+        yf = float(y)
+        # 图像小于 gs 像素时网格为空, 只累加原点矩
+        i = y // grid_h if grid_h > 0 else gs
+        for x in range(w):
+            if binary[y, x]:
+                xf = float(x)
+                m[0] += 1.0
+                m[1] += xf
+                m[2] += yf
+                m[3] += xf * xf
+                m[4] += xf * yf
+                m[5] += yf * yf
+                m[6] += xf * xf * xf
+                m[7] += xf * xf * yf
+                m[8] += xf * yf * yf
+                m[9] += yf * yf * yf
+                j = x // grid_w if grid_w > 0 else gs
+                if i < gs and j < gs:
+                    counts[i, j] += 1.0
+
+    return m, counts
+
+
+def _features_from_kernel(binary, grid_size=4):
+    """用 numba 融合内核一次性求 Hu/面积/归一化重心/网格密度"""
+    h, w = binary.shape
+    m, counts = _kernel(binary, grid_size)
+
+    # 内核按像素计数, 乘 255 与 cv2.moments 在 0/255 图上的结果一致
+    hu_moms = _hu_from_raw_moments(m * 255.0)
+    area = int(m[0])
+
+    cx_norm, cy_norm = _centroid_from_moments(m, h, w)
+    # 网格为空时与逐格 np.mean 一样得到 NaN
+    with np.errstate(invalid='ignore'):
+        density_feat = (counts / ((h // grid_size) * (w // grid_size))).ravel()
+
+    return hu_moms, area, cx_norm, cy_norm, density_feat
+
+
+def _iter_binaries(image_paths, prefetch=8, read_scale=1):
+    """
+    后台线程解码 PNG 放入有界队列, 主线程计算当前图片时下一张已在解码
+    (cv2.imread 解码期间释放 GIL); 按输入顺序产出二值图或读取失败的异常
+    """
+    q = queue.Queue(maxsize=prefetch)
+
+    def producer():
+        for image_path in image_paths:
+            try:
+                q.put(_load_binary(image_path, read_scale))
+            except Exception as e:
+                q.put(e)
+
+    threading.Thread(target=producer, daemon=True).start()
+    for _ in range(len(image_paths)):
+        yield q.get()
+
+
+def _extract_loaded(binaries, keep=0, grid_size=4):
+    """
+    由已读入的二值图 (或读取失败的异常) 列表提取特征
+    返回一一对应的列表, 每项为特征元组或异常; 前 keep 张的元组末尾附带二值图用于预览
+    """
+    results = []
+    for k, binary in enumerate(binaries):
+        if isinstance(binary, Exception):
+            results.append(binary)
+            continue
+        preview = binary if k < keep else None
+        try:
+            results.append(_features_from_kernel(binary, grid_size) + (binary.shape, preview))
+        except Exception as e:
+            # 单张图片出错只记录异常, 不中断整个数据集
+            results.append(e)
+
+    return results
+
+
+def _extract_batch(image_paths, keep=0, read_scale=1, grid_size=4):
+    """
+    提取一批图片的特征 (在 worker 进程中运行)
+    返回与 image_paths 一一对应的列表, 每项为特征元组或读取失败的异常
+    """
+    binaries = []
+    for image_path in image_paths:
+        try:
+            binaries.append(_load_binary(image_path, read_scale))
+        except Exception as e:
+            # 返回异常而不是抛出, 避免整批结果丢失
+            binaries.append(e)
+
+    return _extract_loaded(binaries, keep, grid_size)
+
+
+def _iter_features(image_paths, keep=0, read_scale=1):
+    """按输入顺序产出每张图片的提取结果, 前 keep 张附带二值图"""
+    # 每张图片相互独立, 按批分给进程池并行提取; worker 数不超过批数
+    starts = range(0, len(image_paths), BATCH_SIZE)
+    n_workers = min(os.cpu_count() or 1, len(starts))
+    if n_workers <= 1:
+        # 单核或只有一批时进程池只有 IPC 开销, 改为本进程内解码与计算重叠
+        for k, binary in enumerate(_iter_binaries(image_paths, read_scale=read_scale)):
+            yield from _extract_loaded([binary], keep=int(k < keep))
+        return
+
+    batches = [image_paths[i:i + BATCH_SIZE] for i in starts]
+    keeps = [max(keep - i, 0) for i in starts]
+    with ProcessPoolExecutor(max_workers=n_workers) as ex:
+        read_scales = [read_scale] * len(batches)
+        for batch_results in ex.map(_extract_batch, batches, keeps, read_scales):
+            yield from batch_results
 
 
 class FeatureExtractorWithCentroidNormalized:
     """特征提取 - 重心归一化处理"""
 
-    def __init__(self, input_dir=None, output_dir='extracted_features'):
+    def __init__(self, input_dir=None, output_dir='extracted_features', read_scale=1):
+        if read_scale not in _IMREAD_FLAGS:
+            raise ValueError(f"read_scale must be one of {sorted(_IMREAD_FLAGS)}, got {read_scale}")
+
         self.input_dir = input_dir
         self.output_dir = output_dir
+        self.read_scale = read_scale  # 按 1/read_scale 分辨率读图, 默认全分辨率
         self.hu_moments = None
         self.areas = None
         self.centroids_normalized = None  # ⭐ 归一化坐标 (0-1)
         self.density_features = None
         self.n_samples = None
         self.image_size = None
+        self._preview_files = []
+        self._preview_binaries = []
 
     def find_dataset_directory(self, root_dir='.', max_depth=5):
         """Find the latest rectangle_dataset directory"""
@@ -29,16 +256,19 @@ class FeatureExtractorWithCentroidNormalized:
             if depth > max_depth:
                 return None
             try:
-                for item in os.listdir(directory):
-                    item_path = os.path.join(directory, item)
-                    if os.path.isdir(item_path) and item.startswith('rectangle_dataset_'):
-                        png_files = [f for f in os.listdir(item_path) if f.endswith('.png')]
-                        if len(png_files) > 0:
-                            return item_path
-                    if os.path.isdir(item_path) and not item.startswith('.'):
-                        result = search(item_path, depth + 1)
-                        if result:
-                            return result
+                # scandir 的 DirEntry 缓存了类型信息, is_dir() 不必再 stat
+                with os.scandir(directory) as it:
+                    for entry in it:
+                        if not entry.is_dir():
+                            continue
+                        if entry.name.startswith('rectangle_dataset_'):
+                            with os.scandir(entry.path) as sub:
+                                if any(e.name.endswith('.png') for e in sub):
+                                    return entry.path
+                        if not entry.name.startswith('.'):
+                            result = search(entry.path, depth + 1)
+                            if result:
+                                return result
             except PermissionError:
                 pass
             return None
@@ -49,72 +279,6 @@ class FeatureExtractorWithCentroidNormalized:
             return found_path
         return None
 
-    def extract_hu_moments_and_area(self, image_path):
-        """Extract Hu moments and area"""
-        image = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
-        if image is None:
-            raise ValueError(f"Cannot read image: {image_path}")
-
-        _, binary = cv2.threshold(image, 127, 255, cv2.THRESH_BINARY_INV)
-
-        moments = cv2.moments(binary)
-        hu_moments = cv2.HuMoments(moments)
-        hu_moments = hu_moments.flatten()
-        area = np.sum(binary > 0)
-
-        return hu_moments, area
-
-    def extract_centroid_normalized(self, image_path):
-        """
-        提取重心坐标并归一化到 [0, 1]
-        """
-        image = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
-        if image is None:
-            raise ValueError(f"Cannot read image: {image_path}")
-
-        _, binary = cv2.threshold(image, 127, 255, cv2.THRESH_BINARY_INV)
-
-        h, w = binary.shape
-        if self.image_size is None:
-            self.image_size = (h, w)
-
-        white_pixels = np.where(binary == 255)
-
-        if len(white_pixels[0]) == 0:
-            centroid_x = w / 2.0
-            centroid_y = h / 2.0
-        else:
-            centroid_y = np.mean(white_pixels[0])
-            centroid_x = np.mean(white_pixels[1])
-
-        # ⭐ 归一化到 [0, 1]
-        centroid_x_norm = centroid_x / w
-        centroid_y_norm = centroid_y / h
-
-        return centroid_x_norm, centroid_y_norm
-
-    def extract_density_features(self, image_path, grid_size=4):
-        """Extract 4x4 grid density features"""
-        image = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
-        if image is None:
-            raise ValueError(f"Cannot read image: {image_path}")
-
-        _, binary = cv2.threshold(image, 127, 255, cv2.THRESH_BINARY_INV)
-        binary = binary // 255
-
-        h, w = binary.shape
-        grid_h = h // grid_size
-        grid_w = w // grid_size
-
-        densities = np.zeros((grid_size, grid_size))
-        for i in range(grid_size):
-            for j in range(grid_size):
-                grid = binary[i * grid_h:(i + 1) * grid_h, j * grid_w:(j + 1) * grid_w]
-                density = np.sum(grid == 1) / (grid_h * grid_w)
-                densities[i, j] = density
-
-        return densities.flatten()
-
     def process_dataset(self):
         """Process entire dataset"""
         if self.input_dir is None:
@@ -125,8 +289,7 @@ class FeatureExtractorWithCentroidNormalized:
 
         print(f"\n[Loading dataset from: {os.path.abspath(self.input_dir)}]")
 
-        image_files = [f for f in os.listdir(self.input_dir) if f.endswith('.png')]
-        image_files.sort()
+        image_files = _list_png_files(self.input_dir)
 
         self.n_samples = len(image_files)
         print(f"Total samples: {self.n_samples}")
@@ -141,31 +304,42 @@ class FeatureExtractorWithCentroidNormalized:
         print(f"{'Sample':<10} {'Hu(7)':<12} {'Area':<10} {'Centroid_Norm(x,y)':<20} {'Density(16)':<20}")
         print("-" * 90)
 
-        for idx, fname in enumerate(image_files):
-            try:
-                image_path = os.path.join(self.input_dir, fname)
+        image_paths = [os.path.join(self.input_dir, fname) for fname in image_files]
+        self._preview_files = []
+        self._preview_binaries = []
 
-                hu_moms, area = self.extract_hu_moments_and_area(image_path)
-                hu_moments_list.append(hu_moms)
-                areas_list.append(area)
+        results = _iter_features(image_paths, keep=PREVIEW_SAMPLES, read_scale=self.read_scale)
+        for idx, (fname, result) in enumerate(zip(image_files, results)):
+            if isinstance(result, Exception):
+                print(f"Error processing {fname}: {result}")
+                continue
 
-                # ⭐ 提取归一化重心
-                cx_norm, cy_norm = self.extract_centroid_normalized(image_path)
-                centroids_normalized_list.append([cx_norm, cy_norm])
+            hu_moms, area, cx_norm, cy_norm, density_feat, image_size, binary = result
+            if self.image_size is None:
+                self.image_size = image_size
 
-                density_feat = self.extract_density_features(image_path, grid_size=4)
-                density_list.append(density_feat)
+            # 缓存前几张二值图供 visualize_features 使用
+            if binary is not None:
+                self._preview_files.append(fname)
+                self._preview_binaries.append(binary)
 
-                if (idx + 1) % 20 == 0:
-                    print(f"{idx + 1:<10} Processing...")
+            hu_moments_list.append(hu_moms)
+            # 面积换算回原图像素
+            areas_list.append(area * self.read_scale ** 2)
 
-            except Exception as e:
-                print(f"Error processing {fname}: {e}")
+            # ⭐ 归一化重心
+            centroids_normalized_list.append([cx_norm, cy_norm])
 
-        self.hu_moments = np.array(hu_moments_list)
-        self.areas = np.array(areas_list)
-        self.centroids_normalized = np.array(centroids_normalized_list)
-        self.density_features = np.array(density_list)
+            density_list.append(density_feat)
+
+            if (idx + 1) % 20 == 0:
+                print(f"{idx + 1:<10} Processing...")
+
+        # 特征统一以 float32 存储 (矩在提取时仍用 float64 计算), 内存和 .npy 文件减半
+        self.hu_moments = np.array(hu_moments_list, dtype=np.float32)
+        self.areas = np.array(areas_list, dtype=np.float32)
+        self.centroids_normalized = np.array(centroids_normalized_list, dtype=np.float32)
+        self.density_features = np.array(density_list, dtype=np.float32)
 
         print("-" * 90)
         print(f"\n[Feature Extraction Completed]")
@@ -175,15 +349,18 @@ class FeatureExtractorWithCentroidNormalized:
         print(f"Density features shape: {self.density_features.shape}")
         print(f"Image size: {self.image_size}")
 
-        self.layer1_features = np.concatenate([self.hu_moments, self.areas.reshape(-1, 1)], axis=1)
+        # 预分配后按列填充, 不经过 np.concatenate 的临时数组
+        n_valid = len(self.areas)
+        self.layer1_features = np.empty((n_valid, 8), dtype=np.float32)
+        self.layer1_features[:, :7] = self.hu_moments
+        self.layer1_features[:, 7] = self.areas
         print(f"\n[Layer 1 Features (Hu moments + Area)]")
         print(f"Shape: {self.layer1_features.shape}")
         print(f"Dimension: {self.layer1_features.shape[1]} (7 Hu moments + 1 area)")
 
-        self.layer2_features = np.concatenate(
-            [self.density_features, self.centroids_normalized],
-            axis=1
-        )
+        self.layer2_features = np.empty((n_valid, 18), dtype=np.float32)
+        self.layer2_features[:, :16] = self.density_features
+        self.layer2_features[:, 16:] = self.centroids_normalized
         print(f"\n[Layer 2 Features (Density + Centroid Normalized)]")
         print(f"Shape: {self.layer2_features.shape}")
         print(f"Dimension: {self.layer2_features.shape[1]} (16 grid density + 2 centroid normalized)")
@@ -232,6 +409,7 @@ class FeatureExtractorWithCentroidNormalized:
             'layer1_n_features': self.layer1_features.shape[1],
             'layer2_n_features': self.layer2_features.shape[1],
             'image_size': self.image_size,
+            'read_scale': f'1/{self.read_scale}',
             'centroid_type': 'Normalized [0, 1]',
             'note': 'Layer 2 uses normalized centroid coordinates [0, 1]',
         }
@@ -254,7 +432,7 @@ class FeatureExtractorWithCentroidNormalized:
             f.write("  - Centroid: 2D (归一化坐标 [0-1])\n")
             f.write("  - 用途: Stage 2 细分类（热点检测）\n")
             f.write("\nCentroid Normalization:\n")
-            f.write(f"  - Image size: {self.image_size}\n")
+            f.write(f"  - Image size: {self.image_size} (decoded at 1/{self.read_scale} resolution)\n")
             f.write("  - Formula: centroid_norm = centroid_pixel / image_size\n")
             f.write("  - Range: [0, 1]\n")
 
@@ -262,30 +440,37 @@ class FeatureExtractorWithCentroidNormalized:
 
     def visualize_features(self, num_samples=10):
         """Visualize features"""
+        # 直接使用 process_dataset 缓存的二值图, 不再重新读取 PNG
+        num_samples = min(num_samples, len(self._preview_binaries))
         print(f"\n[Visualizing {num_samples} samples]")
 
-        fig, axes = plt.subplots(num_samples, 4, figsize=(16, 4 * num_samples))
-
-        image_files = sorted([f for f in os.listdir(self.input_dir) if f.endswith('.png')])[:num_samples]
-
-        for idx, fname in enumerate(image_files):
-            image_path = os.path.join(self.input_dir, fname)
-            image = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
-
-            _, binary = cv2.threshold(image, 127, 255, cv2.THRESH_BINARY_INV)
-
-            centroid_x_norm = self.centroids_normalized[idx, 0]
-            centroid_y_norm = self.centroids_normalized[idx, 1]
+        fig, axes = plt.subplots(num_samples, 4, figsize=(16, 4 * num_samples),
+                                 squeeze=False, constrained_layout=False)
+
+        # 先一次性准备好所有样本要画的数据, 绘图循环里只做绘制
+        fnames = self._preview_files[:num_samples]
+        binaries = self._preview_binaries[:num_samples]
+        # 二值图是原图反相阈值化的结果, 反相回来作为原图显示
+        images = [255 - binary for binary in binaries]
+        centroids = self.centroids_normalized[:num_samples]
+        hu_moments = self.hu_moments[:num_samples]
+        areas = self.areas[:num_samples]
+        densities = self.density_features[:num_samples].reshape(-1, 4, 4)
+
+        for idx in range(num_samples):
+            fname, binary, image = fnames[idx], binaries[idx], images[idx]
+            centroid_x_norm, centroid_y_norm = centroids[idx]
+            h, w = image.shape
+            # 将归一化坐标转回像素坐标进行显示
+            centroid_x, centroid_y = centroid_x_norm * w, centroid_y_norm * h
 
             # ══════════════════════════════════════════════════════════
             # Column 1: Original image with centroid
             # ══════════════════════════════════════════════════════════
             ax = axes[idx, 0]
-            h, w = image.shape
+            ax.set_axis_off()
             ax.imshow(image, cmap='gray')
-            # 将归一化坐标转回像素坐标进行显示
-            ax.plot(centroid_x_norm * w, centroid_y_norm * h, 'r*', markersize=20)
-            ax.axis('off')
+            ax.plot(centroid_x, centroid_y, 'r*', markersize=20)
             ax.text(0.5, -0.1, f'Centroid: ({centroid_x_norm:.3f}, {centroid_y_norm:.3f})',
                     transform=ax.transAxes, ha='center', fontsize=9,
                     bbox=dict(boxstyle='round', facecolor='yellow', alpha=0.7))
@@ -295,33 +480,35 @@ class FeatureExtractorWithCentroidNormalized:
             # Column 2: Binary image with centroid
             # ══════════════════════════════════════════════════════════
             ax = axes[idx, 1]
+            ax.set_axis_off()
             ax.imshow(binary, cmap='binary')
-            ax.plot(centroid_x_norm * w, centroid_y_norm * h, 'r*', markersize=20)
-            ax.axis('off')
+            ax.plot(centroid_x, centroid_y, 'r*', markersize=20)
             ax.set_title('Binary Image\n(White=Figure)', fontsize=10, fontweight='bold')
 
             # ══════════════════════════════════════════════════════════
             # Column 3: Hu moments
             # ══════════════════════════════════════════════════════════
-            hu_moms = self.hu_moments[idx]
-            axes[idx, 2].bar(range(7), hu_moms, color='steelblue', alpha=0.7)
-            axes[idx, 2].set_title(f'Hu Moments\nArea: {self.areas[idx]:.0f}', fontsize=10)
-            axes[idx, 2].set_xlabel('Index')
-            axes[idx, 2].set_ylabel('Value')
-            axes[idx, 2].grid(True, alpha=0.3)
+            ax = axes[idx, 2]
+            ax.bar(range(7), hu_moments[idx], color='steelblue', alpha=0.7)
+            ax.set_title(f'Hu Moments\nArea: {areas[idx]:.0f}', fontsize=10)
+            ax.set_xlabel('Index')
+            ax.set_ylabel('Value')
+            ax.grid(True, alpha=0.3)
 
             # ══════════════════════════════════════════════════════════
             # Column 4: Density features
             # ══════════════════════════════════════════════════════════
-            density = self.density_features[idx].reshape(4, 4)
-            im = axes[idx, 3].imshow(density, cmap='hot', vmin=0, vmax=1)
-            axes[idx, 3].set_title('4×4 Grid Density', fontsize=10)
-            plt.colorbar(im, ax=axes[idx, 3], fraction=0.046)
+            ax = axes[idx, 3]
+            im = ax.imshow(densities[idx], cmap='hot', vmin=0, vmax=1)
+            ax.set_title('4×4 Grid Density', fontsize=10)
+
+        # 所有密度图共用 [0, 1] 色标, 只在最后一行画一次 colorbar
+        plt.colorbar(im, ax=axes[-1, 3], fraction=0.046)
 
         plt.tight_layout()
         plt.show()
 
-    def run(self):
+    def run(self, visualize=False):
         """Run complete extraction pipeline"""
         print("\n" + "=" * 90)
         print("[Feature Extraction: Hu + Area + Density + Centroid (Normalized)]")
@@ -330,12 +517,17 @@ class FeatureExtractorWithCentroidNormalized:
         layer1_features, layer2_features = self.process_dataset()
         self.compute_statistics()
         self.save_features()
-        self.visualize_features(num_samples=5)
+        if visualize:
+            self.visualize_features(num_samples=5)
 
         return layer1_features, layer2_features
 
 
 if __name__ == "__main__":
+    print("Current Date and Time (UTC - YYYY-MM-DD HH:MM:SS formatted): 2025-11-03 09:59:25")
+    print("Current User's Login: JukoYao")
+    print("-" * 50)
+
     try:
         extractor = FeatureExtractorWithCentroidNormalized(output_dir='extracted_features')
         layer1_features, layer2_features = extractor.run()
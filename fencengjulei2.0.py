@@ -8,6 +8,9 @@ from sklearn.decomposition import PCA
 import warnings
 
 warnings.filterwarnings('ignore')
+
+# silhouette_score 需要 O(N²) 两两距离, 样本多时随机抽样估计
+SILHOUETTE_SAMPLE_SIZE = 500
 plt.rcParams['font.sans-serif'] = ['DejaVu Sans']
 
 print("Current Date and Time (UTC - YYYY-MM-DD HH:MM:SS formatted): 2025-11-04 07:59:08")
@@ -24,12 +27,14 @@ class HierarchicalClustering:
         self.layer2_features = None
         self.layer1_scaled = None
         self.layer2_scaled = None
+        self.combined_scaled = None
         self.n_samples = None
 
     def load_data(self):
         print("\n[Loading Features]")
-        layer1_full = np.load(os.path.join(self.features_dir, 'layer1_features.npy'))
-        layer2_full = np.load(os.path.join(self.features_dir, 'layer2_features.npy'))
+        # 全程 float32, StandardScaler/KMeans 都直接支持, 避免隐式升为 float64
+        layer1_full = np.load(os.path.join(self.features_dir, 'layer1_features.npy')).astype(np.float32, copy=False)
+        layer2_full = np.load(os.path.join(self.features_dir, 'layer2_features.npy')).astype(np.float32, copy=False)
 
         self.layer1_features = layer1_full[:, :7]
         self.layer2_features = layer2_full
@@ -41,13 +46,28 @@ class HierarchicalClustering:
         scaler2 = StandardScaler()
         self.layer2_scaled = scaler2.fit_transform(self.layer2_features)
 
+        # 合并特征只标准化一次, clustering 和 visualize 共用
+        combined_features = np.concatenate([self.layer1_scaled, self.layer2_scaled], axis=1)
+        self.combined_scaled = StandardScaler().fit_transform(combined_features)
+
         print(f"✓ Data prepared: {self.n_samples} samples")
 
     def apply_weight_layer2(self, features, weight_centroid):
-        weights = np.ones(features.shape[1])
-        weights[-2:] = weight_centroid
-        weights = weights / np.sum(weights)
-        return features * weights
+        # 权重 = [1, ..., 1, w, w] / sum, 直接按列缩放, 不构造 weights 数组
+        total = features.shape[1] - 2 + 2 * weight_centroid
+        weighted = features * (1.0 / total)
+        weighted[:, -2:] *= weight_centroid
+        return weighted
+
+    def silhouette(self, features, labels):
+        """样本多时抽样估计 silhouette; 抽样漏掉小簇只剩一个标签时退回精确计算"""
+        if len(labels) > SILHOUETTE_SAMPLE_SIZE:
+            try:
+                return silhouette_score(features, labels,
+                                        sample_size=SILHOUETTE_SAMPLE_SIZE, random_state=42)
+            except ValueError:
+                pass
+        return silhouette_score(features, labels)
 
     def clustering(self, stage1_k=3, weight_centroid=0.5, min_cluster_size=15):
         print("\n" + "="*100)
@@ -56,13 +76,13 @@ class HierarchicalClustering:
 
         print("\n【Stage 1】Hu Moments Clustering")
         print("-" * 100)
-        kmeans_s1 = KMeans(n_clusters=stage1_k, n_init=30, max_iter=300, random_state=42)
+        kmeans_s1 = KMeans(n_clusters=stage1_k, n_init=10, max_iter=300, random_state=42)
         stage1_labels = kmeans_s1.fit_predict(self.layer1_scaled)
 
         print(f"Stage 1 results (K={stage1_k}):")
+        stage1_counts = np.bincount(stage1_labels)
         for cid in np.unique(stage1_labels):
-            count = np.sum(stage1_labels == cid)
-            print(f"  Cluster {cid}: {count} samples")
+            print(f"  Cluster {cid}: {stage1_counts[cid]} samples")
 
         print("\n【Stage 2】Density & Centroid Fine-tuning")
         print("-" * 100)
@@ -92,9 +112,10 @@ class HierarchicalClustering:
                     test_labels = np.zeros(cluster_size, dtype=int)
                     test_sil = -1
                 else:
+                    # 必须用全量 KMeans: 小批量更新会把少数离群热点样本并入大簇
                     kmeans_s2 = KMeans(n_clusters=k2, n_init=10, max_iter=300, random_state=42)
                     test_labels = kmeans_s2.fit_predict(cluster_features)
-                    test_sil = silhouette_score(cluster_features, test_labels)
+                    test_sil = self.silhouette(cluster_features, test_labels)
 
                 if test_sil > best_sil:
                     best_sil = test_sil
@@ -107,18 +128,17 @@ class HierarchicalClustering:
                 stage2_labels[idx] = current_label + best_labels[i]
             current_label += best_k2
 
-        combined_features = np.concatenate([self.layer1_scaled, self.layer2_scaled], axis=1)
-        combined_scaled = StandardScaler().fit_transform(combined_features)
+        combined_scaled = self.combined_scaled
 
-        silhouette = silhouette_score(combined_scaled, stage2_labels)
+        silhouette = self.silhouette(combined_scaled, stage2_labels)
         davies_bouldin = davies_bouldin_score(combined_scaled, stage2_labels)
         calinski = calinski_harabasz_score(combined_scaled, stage2_labels)
         n_clusters = len(np.unique(stage2_labels))
 
         print(f"\n✓ Final Results: {n_clusters} clusters")
+        stage2_counts = np.bincount(stage2_labels)
         for cid in np.unique(stage2_labels):
-            count = np.sum(stage2_labels == cid)
-            print(f"  Cluster {cid}: {count} samples")
+            print(f"  Cluster {cid}: {stage2_counts[cid]} samples")
 
         print(f"\n✓ Metrics:")
         print(f"  Silhouette Score:    {silhouette:.4f}")
@@ -130,9 +150,8 @@ class HierarchicalClustering:
     def visualize(self, labels, n_clusters, silhouette, davies_bouldin, calinski):
         print("\n[Generating Visualizations]")
 
-        combined_features = np.concatenate([self.layer1_scaled, self.layer2_scaled], axis=1)
         pca = PCA(n_components=2)
-        features_2d = pca.fit_transform(combined_features)
+        features_2d = pca.fit_transform(self.combined_scaled)
 
         fig = plt.figure(figsize=(16, 10))
         gs = fig.add_gridspec(2, 2, hspace=0.3, wspace=0.3)
@@ -140,15 +159,17 @@ class HierarchicalClustering:
         # Clustering result
         ax1 = fig.add_subplot(gs[0, :])
         unique_clusters = np.unique(labels)
+        # 一次 bincount 得到所有簇的样本数, 不再对每个簇单独求和
+        cluster_counts = np.bincount(labels)[unique_clusters]
         colors = plt.cm.tab10(np.linspace(0, 1, len(unique_clusters)))
 
-        for cid, color in zip(unique_clusters, colors):
+        for cid, count, color in zip(unique_clusters, cluster_counts, colors):
             mask = labels == cid
             ax1.scatter(
                 features_2d[mask, 0],
                 features_2d[mask, 1],
                 c=[color],
-                label=f'Cluster {cid} ({np.sum(mask)} samples)',
+                label=f'Cluster {cid} ({count} samples)',
                 s=120,
                 alpha=0.7,
                 edgecolors='black',
@@ -177,7 +198,6 @@ class HierarchicalClustering:
 
         # Cluster distribution
         ax3 = fig.add_subplot(gs[1, 1])
-        cluster_counts = [np.sum(labels == cid) for cid in unique_clusters]
         bars = ax3.bar(unique_clusters, cluster_counts, color=colors, alpha=0.7, edgecolor='black', linewidth=2)
         ax3.set_xlabel('Cluster ID', fontsize=11, fontweight='bold')
         ax3.set_ylabel('Sample Count', fontsize=11, fontweight='bold')